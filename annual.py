@@ -0,0 +1,45 @@
+"""Per-year sums of a measured series, from which its annual means and linear trend follow.
+
+Every year's sums are independent of the others, so rows appended to a series only touch
+the years they fall in: merging their sums into the stored table gives exactly what a full
+recomputation would, without revisiting the earlier rows.
+"""
+import numpy as np
+import pandas as pd
+
+# x is measured from here in the regression sums, keeping their products well conditioned
+TREND_ORIGIN = 2000.0
+
+SUMS = ['n', 'sum_x', 'sum_y', 'sum_xx', 'sum_xy']
+
+
+def annual_sums(df, x, y):
+    """One row per calendar year of ``df[x]`` with the count and regression sums of its rows."""
+    df = df[[x, y]].dropna()
+    dx = df[x].to_numpy(dtype=float) - TREND_ORIGIN
+    dy = df[y].to_numpy(dtype=float)
+    sums = pd.DataFrame({
+        'Year': np.floor(df[x].to_numpy(dtype=float)).astype(np.int16),
+        'n': np.ones(len(df), dtype=np.int32),
+        'sum_x': dx,
+        'sum_y': dy,
+        'sum_xx': dx * dx,
+        'sum_xy': dx * dy,
+    })
+    return sums.groupby('Year', as_index=False)[SUMS].sum()
+
+
+def merge(old, new):
+    """Combine two tables of annual sums, adding up the years present in both."""
+    return pd.concat([old, new]).groupby('Year', as_index=False)[SUMS].sum()
+
+
+def means(sums):
+    """Annual means of the series, indexed by year."""
+    return pd.Series(sums['sum_y'].to_numpy() / sums['n'].to_numpy(), index=sums['Year'].to_numpy())
+
+
+def trend(sums):
+    """Least-squares slope of the whole series, in y units per year."""
+    n, sx, sy, sxx, sxy = (float(sums[column].sum()) for column in SUMS)
+    return (n * sxy - sx * sy) / (n * sxx - sx * sx)
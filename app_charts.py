@@ -0,0 +1,89 @@
+"""The app's charts, wired to their data loaders.
+
+``CHARTS`` maps each chart name to the build artifacts it is drawn from and a function
+building it; main.py, the spec cache and the benchmark all go through it. The emissions
+views other than the annual ranking take a ``(start, end)`` year range, answered from
+prefix-sum rollups.
+"""
+import pandas as pd
+
+import build_data
+import charts
+import loaders
+
+# Points drawn for the CO2 and sea level overviews; zooming in restores full detail.
+LOD_POINTS = 400
+
+
+def co2_chart():
+    return charts.interactive_series(
+        loaders.co2_df(), 'Year', 'monthly_average', 'CO2 (ppm)', [1961, 2023], max_points=LOD_POINTS
+    ).configure_axis(
+        labelFontSize=12,
+        labelFont='Roboto',
+    )
+
+
+def ghg_chart():
+    return charts.ghg_country_chart(loaders.ghg_melted(), loaders.rank_index())
+
+
+def per_capita_chart(start, end):
+    per_capita = loaders.per_capita_rollup().mean(start, end)
+    return charts.ranking_chart(per_capita, f'Mean t CO2 equivalent per person, {start}-{end}')
+
+
+def cumulative_chart(start, end):
+    cumulative = loaders.emissions_rollup().total(start, end)
+    return charts.ranking_chart(cumulative, f'Cumulative Mton CO2 equivalent, {start}-{end}')
+
+
+def coastline_exposure_chart(start, end):
+    cumulative = loaders.emissions_rollup().total(start, end).rename('Emissions')
+    codes = loaders.ghg_melted().drop_duplicates('Country').set_index('Country')['numeric_code']
+    coasts = loaders.coasts().dropna(subset=['numeric_code']).drop_duplicates('numeric_code', keep='last')
+    exposure = pd.DataFrame({'Emissions': cumulative, 'numeric_code': codes.reindex(cumulative.index)}).rename_axis('Country').reset_index()
+    exposure = exposure.merge(coasts.drop(columns='Country'), on='numeric_code')
+    return charts.exposure_chart(
+        exposure[['Country', 'Emissions', 'Coastline Length', 'Coast/area (m/km2)']],
+        f'Cumulative Mton CO2 equivalent, {start}-{end}'
+    )
+
+
+def sea_level_chart():
+    return charts.interactive_series(
+        loaders.sea_level_df(), 'decimal_year', 'GMSL_mm', 'Global Mean Sea Level Variation (mm)', [1995, 2023], max_points=LOD_POINTS
+    )
+
+
+def coastline_chart():
+    return charts.coastline_maps(loaders.world_topology_url())
+
+
+CHARTS = {
+    'co2': (['co2'], co2_chart),
+    'ghg': (['ghg'], ghg_chart),
+    'ghg_per_capita': (['ghg_per_capita'], per_capita_chart),
+    'ghg_cumulative': (['ghg'], cumulative_chart),
+    'ghg_vs_coastline': (['ghg', 'coasts'], coastline_exposure_chart),
+    'sea_level': (['sea_level'], sea_level_chart),
+    'coastline': (['coasts', build_data.WORLD_ASSET], coastline_chart),
+}
+
+# charts taking a (start, end) year range -> the rollup answering it
+YEAR_RANGE_CHARTS = {
+    'ghg_per_capita': loaders.per_capita_rollup,
+    'ghg_cumulative': loaders.emissions_rollup,
+    'ghg_vs_coastline': loaders.emissions_rollup,
+}
+
+
+def year_bounds(name):
+    """First and last year a year-range chart can be drawn over."""
+    years = YEAR_RANGE_CHARTS[name]().years
+    return int(years[0]), int(years[-1])
+
+
+def default_params(name):
+    """Parameters drawing chart ``name`` in full: every year of the data for the range views."""
+    return year_bounds(name) if name in YEAR_RANGE_CHARTS else ()
@@ -0,0 +1,94 @@
+"""Headless startup benchmark for the app.
+
+Times each stage of a cold start on its own (CSV parsing, country-code resolution, the
+cleaning/melt step, artifact loading, chart construction and serialization), then runs
+main.py through Streamlit's AppTest cold and once more warm. Wall time, peak RSS and chart
+payload size per stage are written as JSON so runs can be compared over time.
+
+    python benchmark.py [--output benchmark.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+
+from streamlit.testing.v1 import AppTest
+
+import app_charts
+import build_data
+import country_codes
+import loaders
+from schemas import SCHEMAS
+from spec_cache import specs
+from timings import Timings
+
+MAIN_PATH = os.path.join(build_data.ROOT, 'main.py')
+
+
+def run(timings):
+    sources = dict.fromkeys(source for sources, _, _ in build_data.ARTIFACTS.values() for source in sources)
+    for source in sources:
+        with timings.stage('parse:' + source):
+            SCHEMAS[source].read(os.path.join(build_data.DATA_DIR, source))
+
+    ghg_path = os.path.join(build_data.DATA_DIR, build_data.ARTIFACTS['ghg'][0][0])
+    # the names build_data resolves: aggregate rows are excluded first
+    countries = SCHEMAS[os.path.basename(ghg_path)].read(ghg_path)['Country'].dropna()
+    countries = countries[~countries.isin(build_data.GHG_EXCLUDED)]
+    names = countries.replace(country_codes.DISPLAY_ALIASES).tolist()
+    country_codes.reset()
+    with timings.stage('resolve_country_codes'):
+        country_codes.resolve(names)
+
+    for name, (sources, clean, _) in build_data.ARTIFACTS.items():
+        with timings.stage('clean:' + name):
+            clean(*[os.path.join(build_data.DATA_DIR, source) for source in sources])
+
+    build_data.build()
+    for name in build_data.ARTIFACTS:
+        with timings.stage('load:' + name):
+            build_data.load(name)
+
+    for name, (_, builder) in app_charts.CHARTS.items():
+        with timings.stage('build:' + name):
+            chart = builder(*app_charts.default_params(name))
+        with timings.stage('serialize:' + name) as stage:
+            stage['payload_bytes'] = len(chart.to_json(indent=None))
+
+    loaders.cache.clear()
+    specs.clear()
+    app = AppTest.from_file(MAIN_PATH, default_timeout=300)
+    with timings.stage('app:cold_run'):
+        app.run()
+    with timings.stage('app:rerun'):
+        app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default=os.path.join(build_data.ROOT, 'benchmark.json'), help='where to write the JSON results')
+    args = parser.parse_args()
+
+    timings = Timings(track_rss=True)
+    run(timings)
+    results = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'stages': timings.stages,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    for record in timings.stages:
+        payload = f"  {record['payload_bytes']:>9,} B" if 'payload_bytes' in record else ''
+        memory = f"{record['peak_rss_delta_mb']:>+8.1f} MB peak" if record['peak_rss_delta_mb'] is not None else ''
+        print(f"{record['stage']:<32} {record['seconds'] * 1000:>9.1f} ms  {memory}{payload}")
+    print('wrote ' + args.output)
+
+
+if __name__ == '__main__':
+    main()
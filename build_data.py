@@ -0,0 +1,413 @@
+"""Build tidy, typed Arrow artifacts from the raw CSVs in data/.
+
+The app memory-maps the files written here instead of parsing and reshaping the CSVs on
+every rerun. Each artifact records the SHA-256 of its sources in build/manifest.json and is
+only rebuilt when one of them changes (or when its cleaning code is bumped).
+
+The choropleths read a static copy of the world topology with the coastline columns already
+joined into each country's properties, served by Streamlit from static/. The raw topology,
+data/world-110m.json, is vendored so builds and the app never reach out to a CDN: the Natural
+Earth 1:110m admin-0 countries with ISO 3166 numeric ids (taken from the copy bundled with
+bqplot, its object renamed to ``countries`` as in vega-datasets' world-110m).
+
+The CO2 and sea-level feeds only ever grow by appended rows. When their source still starts
+with exactly the bytes last built from, only the new rows are parsed and appended to the
+artifact, and their per-year sums are merged into the stored annual table (annual.py). How
+far into the source they were built is recorded in the artifacts themselves, so an append
+interrupted before the manifest is written is never applied twice. Rows are only read up to
+the last newline, leaving a row the feed is still writing for the next build.
+
+    python build_data.py            # rebuild stale artifacts
+    python build_data.py --force    # rebuild everything
+"""
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import annual
+import country_codes
+from schemas import SCHEMAS
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(ROOT, 'data')
+# Set by serve.py for its workers: a prepared, read-only copy of build/ that every worker
+# memory-maps (on /dev/shm by default), so the pages are shared rather than per process.
+STORE_DIR = os.environ.get('SEALEVEL_STORE')
+BUILD_DIR = STORE_DIR or os.path.join(ROOT, 'build')
+STATIC_DIR = os.path.join(ROOT, 'static')
+MANIFEST_PATH = os.path.join(BUILD_DIR, 'manifest.json')
+
+WORLD_TOPOLOGY = 'world-110m.json'
+WORLD_ASSET = 'world_110m_coasts.json'
+# Country properties joined into the topology, by coasts_countries.csv column
+COAST_PROPERTIES = ['Country', 'Coastline Length', 'Coast/area (m/km2)']
+
+GHG_EXCLUDED = ['GLOBAL TOTAL', 'EU27', 'International Shipping', 'International Aviation']
+
+
+def clean_co2(path):
+    co2_df = SCHEMAS['mean_co2_ppm.csv'].read(path)
+    return co2_df.rename(columns={'decimal_year': 'Year'})
+
+
+def _edgar_countries(ghg_df):
+    ghg_df_cleaned = ghg_df.dropna(subset=['Country'])
+    ghg_df_cleaned = ghg_df_cleaned[~ghg_df_cleaned['Country'].isin(GHG_EXCLUDED)].copy()
+    ghg_df_cleaned['Country'] = ghg_df_cleaned['Country'].replace(country_codes.DISPLAY_ALIASES)
+    return ghg_df_cleaned
+
+
+def _read_edgar(path):
+    return SCHEMAS[os.path.basename(path)].read(path)
+
+
+def country_index(frames):
+    """One row per EDGAR country across ``frames``, sorted by code, with its numeric code.
+
+    Used as the shared categories of every emissions artifact, so countries line up
+    between metrics.
+    """
+    index = pd.concat([frame[['EDGAR Country Code', 'Country']] for frame in frames])
+    index = index.drop_duplicates('EDGAR Country Code').sort_values('EDGAR Country Code', ignore_index=True)
+    index['numeric_code'] = np.array(country_codes.resolve(index['Country'].tolist()), dtype=np.int16)
+    return index
+
+
+def to_long(ghg_df, index):
+    """Reshape the year columns of an EDGAR table into long format with compact dtypes.
+
+    Rows are ordered year by year, as ``DataFrame.melt`` would, but built directly from the
+    NumPy year block: categorical country columns over ``index``, int16 years and float32
+    values.
+    """
+    year_columns = [column for column in ghg_df.columns if str(column).isdigit()]
+    years = np.array(year_columns, dtype=np.int16)
+    values = ghg_df[year_columns].to_numpy(dtype=np.float32)
+    positions = pd.Index(index['EDGAR Country Code']).get_indexer(ghg_df['EDGAR Country Code'])
+    rows = np.tile(positions, len(years))
+    return pd.DataFrame({
+        'EDGAR Country Code': pd.Categorical.from_codes(rows, categories=index['EDGAR Country Code']),
+        'Country': pd.Categorical.from_codes(rows, categories=index['Country']),
+        'numeric_code': index['numeric_code'].to_numpy()[rows],
+        'Year': np.repeat(years, len(positions)),
+        'Emissions': values.T.ravel(),
+    })
+
+
+def clean_ghg(path, per_capita_path):
+    ghg_df, per_capita_df = _edgar_countries(_read_edgar(path)), _edgar_countries(_read_edgar(per_capita_path))
+    return to_long(ghg_df, country_index([ghg_df, per_capita_df]))
+
+
+def clean_ghg_per_capita(path, per_capita_path):
+    ghg_df, per_capita_df = _edgar_countries(_read_edgar(path)), _edgar_countries(_read_edgar(per_capita_path))
+    return to_long(per_capita_df, country_index([ghg_df, per_capita_df]))
+
+
+def clean_ghg_global(path):
+    ghg_df = _read_edgar(path)
+    global_total = ghg_df[ghg_df['Country'] == 'GLOBAL TOTAL']
+    year_columns = [column for column in ghg_df.columns if str(column).isdigit()]
+    return pd.DataFrame({
+        'Year': np.array(year_columns, dtype=np.int16),
+        'Emissions': global_total[year_columns].to_numpy(dtype=np.float32)[0],
+    })
+
+
+def clean_sea_level(path):
+    sea_level_df = SCHEMAS['sea_level.csv'].read(path)
+    return sea_level_df.rename(columns={'fld3': 'decimal_year', 'fld6': 'GMSL_mm'})
+
+
+def clean_coasts(path):
+    return SCHEMAS['coasts_countries.csv'].read(path)
+
+
+def join_world_topology(topology_path, coasts_path):
+    """Copy the coastline columns into the properties of matching topology countries."""
+    with open(topology_path) as f:
+        topology = json.load(f)
+    coasts = clean_coasts(coasts_path).dropna(subset=['numeric_code'])
+    # the browser-side lookup this replaces kept the last row for a repeated code
+    coasts = coasts.drop_duplicates('numeric_code', keep='last')
+    coasts.index = coasts['numeric_code'].astype(int)
+
+    for geometry in topology['objects']['countries']['geometries']:
+        if 'id' not in geometry or int(geometry['id']) not in coasts.index:
+            continue
+        row = coasts.loc[int(geometry['id']), COAST_PROPERTIES]
+        properties = geometry.setdefault('properties', {})
+        for column, value in row.items():
+            if not (isinstance(value, float) and math.isnan(value)):
+                properties[column] = value
+    return topology
+
+
+# name -> (source files in data/, cleaning function, version). Bump the version when the
+# cleaning function changes so existing artifacts are rebuilt.
+ARTIFACTS = {
+    'co2': (['mean_co2_ppm.csv'], clean_co2, 3),
+    'ghg': (['ghg_EDGAR_country.csv', 'ghg_EDGAR_per_capita.csv'], clean_ghg, 3),
+    'ghg_global': (['ghg_EDGAR_country.csv'], clean_ghg_global, 3),
+    'ghg_per_capita': (['ghg_EDGAR_country.csv', 'ghg_EDGAR_per_capita.csv'], clean_ghg_per_capita, 3),
+    'sea_level': (['sea_level.csv'], clean_sea_level, 3),
+    'coasts': (['coasts_countries.csv'], clean_coasts, 2),
+}
+
+
+# Artifacts whose single source is only ever appended to -> (x, y) columns of the series
+# summarised in their '<name>_annual' table
+APPEND_ONLY = {
+    'co2': ('Year', 'monthly_average'),
+    'sea_level': ('decimal_year', 'GMSL_mm'),
+}
+
+# Schema metadata of an append-only artifact and its annual table: the number of source bytes
+# they were built from and the SHA-256 of those bytes
+SOURCE_OFFSET = b'source_offset'
+SOURCE_SHA256 = b'source_sha256'
+
+
+# file in static/ -> (source files in data/, builder returning JSON, version)
+STATIC_ASSETS = {
+    WORLD_ASSET: ([WORLD_TOPOLOGY, 'coasts_countries.csv'], join_world_topology, 2),
+}
+
+
+def file_hash(path, size=None):
+    """SHA-256 of the file, or of only its first ``size`` bytes."""
+    digest = hashlib.sha256()
+    remaining = os.path.getsize(path) if size is None else size
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def artifact_path(name):
+    return os.path.join(BUILD_DIR, name + '.arrow')
+
+
+def annual_name(name):
+    return name + '_annual'
+
+
+def artifact_files():
+    """File names in BUILD_DIR making up a complete build, manifest included."""
+    names = list(ARTIFACTS) + [annual_name(name) for name in APPEND_ONLY]
+    return [name + '.arrow' for name in names] + [os.path.basename(MANIFEST_PATH)]
+
+
+def read_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest):
+    tmp_path = MANIFEST_PATH + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def _entry(sources, version):
+    return {
+        'version': version,
+        'sources': {source: file_hash(os.path.join(DATA_DIR, source)) for source in sources},
+    }
+
+
+def _stale(manifest, name, entry, path, force):
+    # compared on the keys of ``entry`` only, so entries carrying older bookkeeping still match
+    recorded = manifest.get(name) or {}
+    return force or {key: recorded.get(key) for key in entry} != entry or not os.path.exists(path)
+
+
+def _write_artifact(name, data, mark=None):
+    """Write a DataFrame or Arrow table as the artifact ``name``, tagged with its source ``mark``."""
+    if isinstance(data, pd.DataFrame):
+        data = pa.Table.from_pandas(data.reset_index(drop=True), preserve_index=False)
+    if mark is not None:
+        offset, digest = mark
+        data = data.replace_schema_metadata(
+            (data.schema.metadata or {}) | {SOURCE_OFFSET: str(offset).encode(), SOURCE_SHA256: digest.encode()})
+    tmp_path = artifact_path(name) + '.tmp'
+    # uncompressed so readers can memory-map the columns directly
+    feather.write_feather(data, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, artifact_path(name))
+
+
+def _source_mark(name):
+    """``(offset, sha256)`` of the source bytes an append-only artifact holds, or None."""
+    try:
+        metadata = pa.ipc.open_file(pa.memory_map(artifact_path(name))).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if SOURCE_OFFSET not in metadata or SOURCE_SHA256 not in metadata:
+        return None
+    return int(metadata[SOURCE_OFFSET]), metadata[SOURCE_SHA256].decode()
+
+
+def _complete_rows(data):
+    """``data`` up to and including its last newline."""
+    return data[:data.rfind(b'\n') + 1]
+
+
+def _build_append_only(name, source_path):
+    """Build an append-only artifact and its annual table from every complete row of its source."""
+    with open(source_path, 'rb') as f:
+        data = _complete_rows(f.read())
+    df = ARTIFACTS[name][1](io.BytesIO(data))
+    mark = (len(data), hashlib.sha256(data).hexdigest())
+    _write_artifact(name, df, mark)
+    _write_artifact(annual_name(name), annual.annual_sums(df, *APPEND_ONLY[name]), mark)
+
+
+def _append(name, recorded, entry):
+    """Append the rows added to an append-only source since its artifact was built.
+
+    Returns False, leaving everything untouched, when the source is not the one built from
+    plus new rows, or the artifact and its annual table were built from different bytes of
+    it; the caller then rebuilds from scratch.
+    """
+    (source,) = entry['sources']
+    source_path = os.path.join(DATA_DIR, source)
+    mark = _source_mark(name)
+    if not recorded or recorded['version'] != entry['version'] \
+            or mark is None or _source_mark(annual_name(name)) != mark:
+        return False
+    offset, digest = mark
+    if os.path.getsize(source_path) < offset or file_hash(source_path, offset) != digest:
+        return False
+
+    with open(source_path, 'rb') as f:
+        header = f.readline()
+        f.seek(offset)
+        appended = _complete_rows(f.read())
+    if not appended:
+        # already built up to here, by a build whose manifest update never happened
+        return True
+    new_rows = ARTIFACTS[name][1](io.BytesIO(header + appended))
+    stored = feather.read_table(artifact_path(name), memory_map=True)
+    try:
+        new_table = pa.Table.from_pandas(new_rows, schema=stored.schema, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, KeyError):
+        return False
+
+    x, y = APPEND_ONLY[name]
+    sums = annual.merge(load(annual_name(name)), annual.annual_sums(new_rows, x, y))
+    mark = (offset + len(appended), file_hash(source_path, offset + len(appended)))
+    # the stored columns are copied over from the mapping without being parsed, into a single
+    # record batch so load() can still map every column instead of copying chunks together
+    _write_artifact(name, pa.concat_tables([stored, new_table]).combine_chunks(), mark)
+    _write_artifact(annual_name(name), sums, mark)
+    return True
+
+
+def build(names=None, force=False):
+    """Rebuild the stale artifacts among ``names`` (all by default) and return their names.
+
+    Nothing is built when attached to a shared store; serve.py prepares it before starting any worker.
+    """
+    if STORE_DIR:
+        return []
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    manifest = read_manifest()
+    rebuilt = []
+    for name in names or list(ARTIFACTS) + list(STATIC_ASSETS):
+        if name in STATIC_ASSETS:
+            sources, builder, version = STATIC_ASSETS[name]
+            path = os.path.join(STATIC_DIR, name)
+            missing = [source for source in sources if not os.path.exists(os.path.join(DATA_DIR, source))]
+            if missing:
+                raise FileNotFoundError(f'{name} needs data/{missing[0]}, which is vendored with the repository')
+        else:
+            sources, builder, version = ARTIFACTS[name]
+            path = artifact_path(name)
+            recorded = manifest.get(name)
+            if not force and recorded and set(recorded['sources']) != set(sources):
+                # written from other inputs by ingest_edgar.py; kept until those inputs change
+                others = list(recorded['sources'])
+                if all(os.path.exists(os.path.join(DATA_DIR, source)) for source in others) \
+                        and not _stale(manifest, name, _entry(others, version), path, force):
+                    continue
+        entry = _entry(sources, version)
+        if not _stale(manifest, name, entry, path, force):
+            continue
+        if name in APPEND_ONLY:
+            if force or not _append(name, manifest.get(name), entry):
+                _build_append_only(name, os.path.join(DATA_DIR, sources[0]))
+            manifest[name] = entry
+            rebuilt.append(name)
+            continue
+
+        result = builder(*[os.path.join(DATA_DIR, source) for source in sources])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if name in STATIC_ASSETS:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(result, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        else:
+            _write_artifact(name, result)
+        manifest[name] = entry
+        rebuilt.append(name)
+    if rebuilt:
+        _write_manifest(manifest)
+    return rebuilt
+
+
+def record_artifact(name, sources):
+    """Register an artifact written outside :func:`build` as built from ``sources``."""
+    manifest = read_manifest()
+    manifest[name] = _entry([os.path.relpath(source, DATA_DIR) for source in sources], ARTIFACTS[name][2])
+    _write_manifest(manifest)
+
+
+def data_version(names):
+    """Content hash of the manifest entries for ``names``, changing whenever their sources do."""
+    manifest = read_manifest()
+    entries = json.dumps({name: manifest.get(name) for name in names}, sort_keys=True)
+    return hashlib.sha256(entries.encode()).hexdigest()
+
+
+def load(name):
+    """Memory-map a built artifact as a DataFrame.
+
+    Numeric columns without nulls keep pointing at the mapped file instead of being
+    copied, so the frame is read-only and its pages are shared with other processes
+    mapping the same artifact.
+    """
+    return feather.read_table(artifact_path(name), memory_map=True).to_pandas(split_blocks=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('names', nargs='*', help='artifacts to build (default: all)')
+    parser.add_argument('--force', action='store_true', help='rebuild even if the sources are unchanged')
+    args = parser.parse_args()
+    unknown = sorted(set(args.names) - set(ARTIFACTS) - set(STATIC_ASSETS))
+    if unknown:
+        parser.error('unknown artifact(s): ' + ', '.join(unknown))
+
+    rebuilt = build(args.names, force=args.force)
+    print('rebuilt: ' + ', '.join(rebuilt) if rebuilt else 'all artifacts up to date')
+
+
+if __name__ == '__main__':
+    main()
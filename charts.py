@@ -0,0 +1,176 @@
+"""Altair chart builders for the app, kept free of Streamlit calls so they can be reused."""
+import altair as alt
+
+import downsample
+
+TOP_N = 15
+
+
+def _shortest_floats(values):
+    # float32 columns would serialize with float64 noise digits (5750.02978515625); going
+    # through their shortest round-tripping repr keeps the spec as small as before
+    return values.astype(str).astype(float) if values.dtype == 'float32' else values
+
+
+def ghg_country_chart(ghg_melted, ranks, top_n=TOP_N, precompute=True):
+    """Bar chart of the top emitters for the year picked on a slider.
+
+    With ``precompute`` the per-year top-N is read off the rank index ``ranks`` and only
+    those rows are embedded in the spec; otherwise the full table is shipped and Vega
+    ranks it in the browser on every slider move.
+    """
+    max_emissions = float(ghg_melted.Emissions.max())
+    year_slider = alt.binding_range(min=int(ghg_melted.Year.min()), max=int(ghg_melted.Year.max()), step=1)
+    slider_selection = alt.selection_point(bind=year_slider, fields=['Year'], name="Select", value=int(ghg_melted.Year.max()))
+
+    if precompute:
+        top = ranks.top_k_by_year(top_n)[['Country', 'Year', 'Emissions']]
+        # the index sums in float64; back in the artifact's dtype the values are unchanged
+        emissions = _shortest_floats(top['Emissions'].astype(ghg_melted['Emissions'].dtype))
+        chart = alt.Chart(top.assign(Emissions=emissions)).mark_bar().add_params(
+            slider_selection
+        ).transform_filter(
+            slider_selection
+        )
+    else:
+        alt.data_transformers.disable_max_rows()
+        chart = alt.Chart(ghg_melted).mark_bar().add_params(
+            slider_selection
+        ).transform_filter(
+            slider_selection
+        ).transform_window(
+            rank='rank(Emissions)',
+            sort=[alt.SortField('Emissions', order='descending')],
+            groupby=['Year']
+        ).transform_filter(
+            alt.datum.rank <= top_n
+        )
+
+    return chart.encode(
+        y=alt.Y('Country:N', sort=alt.EncodingSortField(field='Emissions', order='descending'), axis=alt.Axis(title=None)),
+        x=alt.X(
+            'Emissions:Q',
+            title='Mton CO2 equivalent',
+            scale=alt.Scale(domain=(0, max_emissions))
+        ),
+        color=alt.Color('Emissions:Q', legend=alt.Legend(title="Emissions (Mton CO2 eq)"), scale=alt.Scale(domain=(0, max_emissions), scheme='reds')),
+        tooltip=['Country', 'Year', 'Emissions']
+    )
+
+
+def ranking_chart(values, title, top_n=TOP_N):
+    """Bar chart of the ``top_n`` largest entries of a Series indexed by country."""
+    top = values.nlargest(top_n).rename_axis('Country').reset_index(name='value')
+    return alt.Chart(top).mark_bar().encode(
+        y=alt.Y('Country:N', sort=alt.EncodingSortField(field='value', order='descending'), axis=alt.Axis(title=None)),
+        x=alt.X('value:Q', title=title),
+        color=alt.Color('value:Q', legend=None, scale=alt.Scale(scheme='reds')),
+        tooltip=['Country', alt.Tooltip('value:Q', title=title, format=',.2f')]
+    )
+
+
+def exposure_chart(exposure, title):
+    """Log-log scatter of each country's emissions against its coastline length.
+
+    ``exposure`` has one row per country with Country, Emissions, Coastline Length and
+    Coast/area (m/km2) columns.
+    """
+    exposure = exposure[(exposure['Emissions'] > 0) & (exposure['Coastline Length'] > 0)]
+    return alt.Chart(exposure).mark_circle(size=60, opacity=0.7).encode(
+        x=alt.X('Emissions:Q', title=title, scale=alt.Scale(type='log')),
+        y=alt.Y('Coastline Length:Q', title='Coastline Length (km)', scale=alt.Scale(type='log')),
+        color=alt.Color('Coast/area (m/km2):Q', scale=alt.Scale(type='sqrt', scheme='yellowgreenblue'), legend=alt.Legend(title='Coast/area ratio (m/km2)')),
+        tooltip=['Country:N', alt.Tooltip('Emissions:Q', format=',.1f'), 'Coastline Length:Q', 'Coast/area (m/km2):Q']
+    )
+
+
+def interactive_series(df, x, y, y_title, x_domain, max_points=None, method='lttb'):
+    """Zoomable line chart with a hover rule, dot and value label at the nearest point.
+
+    All layers share one dataset, so it is serialized once. If ``max_points`` is set and the
+    series is longer, only a downsampled overview is drawn (and searched on hover) until the
+    zoomed window is narrow enough to show every point within the same budget.
+    """
+    zoom = alt.selection_interval(bind='scales', encodings=['x'], name='zoom')
+    nearest = alt.selection_point(on='mouseover', nearest=True, empty=False, encodings=['x'], name='nearest')
+
+    source = df[[x, y]]
+    base = alt.Chart().encode(
+        y = alt.Y(f'{y}:Q', title=y_title),
+        x = alt.X(f'{x}:Q', title='Year', axis=alt.Axis(format='d', title=None), scale=alt.Scale(domain=x_domain)),
+        tooltip=alt.value(None),
+    )
+
+    line = base.mark_line().add_params(
+        zoom
+    )
+
+    vertical_line = alt.Chart().mark_rule(size=4, color='lightgray').encode(
+        x=f'{x}:Q',
+        opacity=alt.condition(nearest, alt.value(0.7), alt.value(0)),
+        tooltip=alt.value(None),
+    ).add_params(
+        nearest
+    )
+
+    interaction_dots = base.mark_point(size=90, color='firebrick').transform_filter(
+        nearest
+    ).encode(
+        opacity=alt.condition(nearest, alt.value(1), alt.value(0))
+    )
+
+    text_labels = base.mark_text(align='left', dx=-40, dy=-15).encode(
+        text=alt.condition(nearest, alt.Text(f'{y}:Q', format='.2f'), alt.value(' '))
+    ).transform_filter(
+        nearest
+    )
+
+    if max_points is not None and len(source) > max_points:
+        source = source.assign(overview=downsample.overview_mask(source[x], source[y], max_points, method))
+        # widest zoom window that still holds no more than max_points at full resolution
+        detail_span = (source[x].max() - source[x].min()) * max_points / len(source)
+        chart = alt.layer(line, vertical_line, interaction_dots, text_labels, data=source).transform_filter(
+            f"datum.overview || (isValid(zoom['{x}']) && zoom['{x}'][1] - zoom['{x}'][0] < {detail_span})"
+        )
+    else:
+        chart = alt.layer(line, vertical_line, interaction_dots, text_labels, data=source)
+    return chart
+
+
+def _choropleth(countries, field, legend_title):
+    return alt.Chart(countries).mark_geoshape(
+        stroke='#aaa', strokeWidth=0.25
+    ).encode(
+        alt.Color(f'{field}:Q', scale=alt.Scale(type='sqrt',scheme='yellowgreenblue'), legend=alt.Legend(title=legend_title)),
+    ).project(
+        type='equalEarth'
+    ).properties(
+        width=600,
+        height=450
+    )
+
+
+def coastline_maps(topology_url):
+    """Stacked choropleths of coastline length and coastline per land area.
+
+    ``topology_url`` points at the topology built by build_data.py, whose country
+    properties already carry the coastline columns, so both maps reference one static
+    file and need no lookup.
+    """
+    countries = alt.topo_feature(topology_url, 'countries')
+    choro = _choropleth(countries, 'properties.Coastline Length', 'Coastline Length (km)').encode(
+        tooltip=[
+            alt.Tooltip('properties.Country:N', title='Country'),
+            alt.Tooltip('properties.Coastline Length:Q', title='Coastline Length'),
+        ]
+    )
+    coast_per_area = _choropleth(countries, 'properties.Coast/area (m/km2)', 'Coast/area ratio (m/km2)').encode(
+        tooltip=[
+            alt.Tooltip('properties.Country:N', title='Country'),
+            alt.Tooltip('properties.Coast/area (m/km2):Q', title='Coast/area (m/km2)'),
+        ]
+    )
+
+    return (choro & coast_per_area).resolve_scale(
+        color='independent'
+    )
@@ -0,0 +1 @@
+"""Lets ``pytest`` run from the repository root import the top-level modules under test."""
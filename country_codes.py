@@ -0,0 +1,115 @@
+import csv
+import os
+import threading
+import warnings
+
+import pycountry
+
+# kept out of data/, which loaders.cache watches: writing a new name there would drop every
+# cached frame
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'country_codes.csv')
+MISSING = -1
+
+# EDGAR groups a few territories with their neighbours; these rows are shown under the main country.
+DISPLAY_ALIASES = {
+    'Italy, San Marino and the Holy See': 'Italy',
+    'Spain and Andorra': 'Spain',
+    'France and Monaco': 'France',
+}
+
+# EDGAR names that pycountry does not know under any of its exact names.
+LOOKUP_ALIASES = {
+    'Switzerland and Liechtenstein': 'Switzerland',
+    'Côte d’Ivoire': "Côte d'Ivoire",
+    'Democratic Republic of the Congo': 'Congo, The Democratic Republic of the',
+    'Faroes': 'Faroe Islands',
+    'Israel and Palestine, State of': 'Israel',
+    'Myanmar/Burma': 'Myanmar',
+    'Sudan and South Sudan': 'Sudan',
+    'The Gambia': 'Gambia',
+    'South Korea': 'Korea, Republic of',
+    'North Korea': "Korea, Democratic People's Republic of",
+    'Laos': "Lao People's Democratic Republic",
+    'Brunei': 'Brunei Darussalam',
+    'Russia': 'Russian Federation',
+    'Vietnam': 'Viet Nam',
+    'Turkey': 'Türkiye',
+}
+
+_lock = threading.Lock()
+_index = None
+_resolved = None
+
+
+def _build_index():
+    index = {}
+    with warnings.catch_warnings():
+        # pycountry warns when official_name/common_name is absent and falls back to name
+        warnings.simplefilter('ignore', UserWarning)
+        for country in pycountry.countries:
+            for attr in ('name', 'official_name', 'common_name'):
+                name = getattr(country, attr, None)
+                if name:
+                    index.setdefault(name.casefold(), int(country.numeric))
+    return index
+
+
+def _load_table():
+    table = {}
+    if os.path.exists(TABLE_PATH):
+        with open(TABLE_PATH, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                table[row['Country']] = int(row['numeric_code'])
+    return table
+
+
+def _save_table(table):
+    tmp_path = TABLE_PATH + '.tmp'
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Country', 'numeric_code'])
+        for name in sorted(table):
+            writer.writerow([name, table[name]])
+    os.replace(tmp_path, TABLE_PATH)
+
+
+def _lookup(name):
+    key = LOOKUP_ALIASES.get(name, name).casefold()
+    if key in _index:
+        return _index[key]
+    try:
+        return int(pycountry.countries.search_fuzzy(name)[0].numeric)
+    except LookupError:
+        return MISSING
+
+
+def resolve(names):
+    """Map country names to ISO 3166 numeric codes, -1 where no country matches.
+
+    Each distinct name is resolved once per process. Lookups go through an exact index of
+    pycountry names first and only fall back to fuzzy search on a miss; new results are
+    written back to country_codes.csv so later cold starts skip them entirely.
+    """
+    global _index, _resolved
+    with _lock:
+        if _resolved is None:
+            _resolved = _load_table()
+        new = [name for name in dict.fromkeys(names) if name not in _resolved]
+        if new:
+            if _index is None:
+                _index = _build_index()
+            for name in new:
+                _resolved[name] = _lookup(name)
+            try:
+                _save_table(_resolved)
+            except OSError:
+                pass
+        return [_resolved[name] for name in names]
+
+
+def reset():
+    """Forget the in-memory results and index; the on-disk table is kept."""
+    global _index, _resolved
+    with _lock:
+        _index = None
+        _resolved = None
@@ -0,0 +1,67 @@
+import functools
+import os
+import threading
+
+
+class DataCache:
+    """Process-wide memo for data loaders, shared by every Streamlit session.
+
+    Entries are dropped as soon as any file under ``watch_dir`` is added, removed or
+    modified, so the next call reloads from disk. Cached values are shared between
+    sessions and must be treated as read-only.
+    """
+
+    def __init__(self, watch_dir):
+        self.watch_dir = watch_dir
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._signature = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def signature(self):
+        entries = []
+        for dirpath, _, filenames in os.walk(self.watch_dir):
+            for filename in filenames:
+                stat = os.stat(os.path.join(dirpath, filename))
+                entries.append((os.path.join(dirpath, filename), stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(entries))
+
+    def _check(self):
+        signature = self.signature()
+        if signature != self._signature:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._signature = signature
+
+    def get(self, key, loader):
+        with self._lock:
+            self._check()
+            if key in self._entries:
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            value = self._entries[key] = loader()
+            return value
+
+    def cached(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            return self.get((fn.__name__,) + args, lambda: fn(*args))
+        return wrapper
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._signature = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+            }
@@ -0,0 +1,57 @@
+"""Point-count reduction for line charts that keeps their visual shape."""
+import numpy as np
+
+
+def lttb(x, y, n_out):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; every bucket in between contributes the
+    point forming the largest triangle with the previously kept point and the mean of the
+    next bucket. ``x`` must be sorted.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+        area = np.abs(
+            (x[a] - next_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (next_y - y[a])
+        )
+        a = kept[i + 1] = start + int(np.argmax(area))
+    return kept
+
+
+def min_max(x, y, n_out):
+    """Indices of the minimum and maximum of ``y`` in each of ``n_out // 2`` equal-count buckets."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_out // 2 + 1).astype(int)
+    kept = []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        if stop > start:
+            bucket = y[start:stop]
+            kept.extend((start + int(np.argmin(bucket)), start + int(np.argmax(bucket))))
+    return np.unique(kept)
+
+
+METHODS = {'lttb': lttb, 'minmax': min_max}
+
+
+def overview_mask(x, y, n_out, method='lttb'):
+    """Boolean mask selecting the points of the downsampled overview."""
+    mask = np.zeros(len(x), dtype=bool)
+    mask[METHODS[method](x, y, n_out)] = True
+    return mask
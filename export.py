@@ -0,0 +1,229 @@
+"""Export the app's charts as a static bundle any file server can host.
+
+The charts are built once, from the same definitions as the app (app_charts.CHARTS), and
+written out with everything needed to view them offline:
+
+    index.html                  the page, embedding each chart from its spec
+    vega.js                     Vega, Vega-Lite and Vega-Embed, bundled by vl-convert
+    specs/<chart>.json          Vega-Lite specs, referencing their data by URL
+    data/<dataset>.json         each distinct dataset once, shared by every spec using it
+    data/world_110m_coasts.json the pre-joined topology
+    images/coastline.svg|.png   pre-rendered maps for viewers without JavaScript
+
+The export fails, exiting non-zero, if any chart would still fetch data from the network.
+
+    python export.py [--output dist] [--no-images]
+"""
+import argparse
+import contextlib
+import html
+import json
+import os
+import shutil
+
+import altair as alt
+import vl_convert
+
+import app_charts
+import build_data
+import loaders
+
+DEFAULT_OUTPUT = os.path.join(build_data.ROOT, 'dist')
+# everything an export writes; only these are cleared from a previous bundle
+BUNDLE_DIRS = ['specs', 'data', 'images']
+BUNDLE_FILES = ['index.html', 'vega.js']
+TITLE = 'Responsibility and Impact of Climate Change'
+
+# chart name -> heading; the year-range views are exported over every year of the data
+EXPORTS = {
+    'co2': 'Atmospheric carbon dioxide',
+    'ghg': 'Greenhouse gas emissions by country',
+    'ghg_per_capita': 'Emissions per capita',
+    'ghg_cumulative': 'Cumulative emissions',
+    'ghg_vs_coastline': 'Emissions vs. coastline',
+    'sea_level': 'Global mean sea level',
+    'coastline': 'Coastline maps',
+}
+
+# choropleths that get pre-rendered fallbacks
+IMAGE_CHARTS = ['coastline']
+IMAGE_SCALE = 2
+
+# the Vega-Lite release Altair's specs target, as vl-convert names it ('v5_16')
+VL_VERSION = '_'.join(alt.SCHEMA_VERSION.split('.')[:2])
+
+
+def _dump(obj, path):
+    with open(path, 'w') as f:
+        json.dump(obj, f, separators=(',', ':'))
+
+
+def _map_data(node, replace):
+    """Call ``replace`` on every ``data`` definition in a spec, swapping in its result."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == 'data' and isinstance(value, dict):
+                node[key] = replace(value)
+            _map_data(node[key], replace)
+    elif isinstance(node, list):
+        for item in node:
+            _map_data(item, replace)
+
+
+def _data_definitions(spec):
+    found = []
+    _map_data(spec, lambda data: found.append(data) or data)
+    return found
+
+
+class OfflineError(RuntimeError):
+    """A chart references data the bundle cannot serve itself."""
+
+
+def _remote_urls(spec):
+    urls = (data.get('url') for data in _data_definitions(spec))
+    return [url for url in urls if isinstance(url, str) and (url.startswith('//') or '://' in url)]
+
+
+def _static_file(url):
+    """Path of the file in static/ served at ``url`` by the app, or None."""
+    if isinstance(url, str) and url.startswith(loaders.STATIC_URL):
+        return os.path.join(build_data.STATIC_DIR, url[len(loaders.STATIC_URL):])
+    return None
+
+
+def externalize(spec, output_dir):
+    """Move the inline datasets of ``spec`` into shared files under data/, in place.
+
+    Altair names each dataset after a hash of its values, so a dataset used by several
+    charts is written once. Files the app serves from static/ are copied alongside.
+    """
+    datasets = spec.pop('datasets', {})
+    for name, values in datasets.items():
+        path = os.path.join(output_dir, 'data', name + '.json')
+        if not os.path.exists(path):
+            _dump(values, path)
+
+    def replace(data):
+        if data.get('name') in datasets:
+            return {'url': f'data/{data["name"]}.json'}
+        source = _static_file(data.get('url'))
+        if source is not None:
+            shutil.copyfile(source, os.path.join(output_dir, 'data', os.path.basename(source)))
+            return dict(data, url='data/' + os.path.basename(source))
+        return data
+
+    _map_data(spec, replace)
+    return spec
+
+
+def render_images(spec, output_dir, name):
+    """Write SVG and PNG renderings of ``spec`` and return the SVG path."""
+    def inline(data):
+        # vl-convert does not read local files, so the topology goes in as values
+        source = _static_file(data.get('url'))
+        if source is None:
+            return data
+        with open(source) as f:
+            values = json.load(f)
+        return {key: value for key, value in data.items() if key != 'url'} | {'values': values}
+
+    _map_data(spec, inline)
+    svg_path = os.path.join(output_dir, 'images', name + '.svg')
+    with open(svg_path, 'w') as f:
+        f.write(vl_convert.vegalite_to_svg(spec, vl_version=VL_VERSION))
+    with open(os.path.join(output_dir, 'images', name + '.png'), 'wb') as f:
+        f.write(vl_convert.vegalite_to_png(spec, vl_version=VL_VERSION, scale=IMAGE_SCALE))
+    return svg_path
+
+
+def write_page(output_dir, sections):
+    """Write index.html embedding the specs of ``sections``, a list of (name, heading, image)."""
+    body = []
+    for name, heading, image in sections:
+        body.append(f'<h2>{html.escape(heading)}</h2>')
+        fallback = f'<noscript><img src="{image}" alt="{html.escape(heading)}"></noscript>' if image else ''
+        body.append(f'<div id="{name}" class="chart">{fallback}</div>')
+    names = json.dumps([name for name, _, _ in sections])
+    page = f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(TITLE)}</title>
+<style>
+body {{ font-family: sans-serif; max-width: 960px; margin: 0 auto; padding: 1em; }}
+.chart {{ width: 100%; }}
+.chart img {{ max-width: 100%; }}
+</style>
+<script src="vega.js"></script>
+</head>
+<body>
+<h1>{html.escape(TITLE)}</h1>
+{chr(10).join(body)}
+<script>
+for (const name of {names}) {{
+  vegaEmbed('#' + name, 'specs/' + name + '.json', {{actions: false}});
+}}
+</script>
+</body>
+</html>
+'''
+    with open(os.path.join(output_dir, 'index.html'), 'w') as f:
+        f.write(page)
+
+
+def _clear_bundle(output_dir):
+    """Remove a previous bundle from ``output_dir``, refusing a directory holding anything else."""
+    if not os.path.isdir(output_dir) or not os.listdir(output_dir):
+        return
+    if not (os.path.isfile(os.path.join(output_dir, 'index.html')) and os.path.isdir(os.path.join(output_dir, 'specs'))):
+        raise FileExistsError(f'{output_dir} is not empty and does not hold a previous export')
+    for subdir in BUNDLE_DIRS:
+        shutil.rmtree(os.path.join(output_dir, subdir), ignore_errors=True)
+    for name in BUNDLE_FILES:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(output_dir, name))
+
+
+def export(output_dir=DEFAULT_OUTPUT, images=True):
+    """Build every chart and write the bundle to ``output_dir``, replacing a previous bundle there.
+
+    Raises FileExistsError if ``output_dir`` holds anything but a previous bundle, and
+    OfflineError if a chart references remote data.
+    """
+    _clear_bundle(output_dir)
+    for subdir in BUNDLE_DIRS:
+        os.makedirs(os.path.join(output_dir, subdir))
+    with open(os.path.join(output_dir, 'vega.js'), 'w') as f:
+        f.write(vl_convert.javascript_bundle(vl_version=VL_VERSION))
+
+    sections = []
+    for name, heading in EXPORTS.items():
+        _, builder = app_charts.CHARTS[name]
+        spec = builder(*app_charts.default_params(name)).to_dict()
+        remote = _remote_urls(spec)
+        if remote:
+            raise OfflineError(f'{name} fetches {remote[0]}, which the bundle cannot serve offline')
+        image = None
+        if images and name in IMAGE_CHARTS:
+            image = os.path.relpath(render_images(json.loads(json.dumps(spec)), output_dir, name), output_dir)
+        _dump(externalize(spec, output_dir), os.path.join(output_dir, 'specs', name + '.json'))
+        sections.append((name, heading, image))
+    write_page(output_dir, sections)
+    return output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='bundle directory: empty, new or a previous export')
+    parser.add_argument('--no-images', action='store_true', help='skip the pre-rendered map images')
+    args = parser.parse_args()
+    try:
+        output_dir = export(args.output, images=not args.no_images)
+    except (FileExistsError, OfflineError) as error:
+        parser.exit(1, f'export failed: {error}\n')
+    print('exported to ' + output_dir)
+
+
+if __name__ == '__main__':
+    main()
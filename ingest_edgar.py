@@ -0,0 +1,155 @@
+"""Convert an EDGAR GHG booklet (.xlsx) straight into the app's emissions artifacts.
+
+The country totals and per-capita sheets are streamed with openpyxl in read-only mode and
+written one country at a time to the same long-format Arrow files build_data.py produces
+(ghg, ghg_global and ghg_per_capita), so the workbook is never loaded whole. Once a sheet is
+done its batches are rewritten as one, so the artifact memory-maps without copies like the
+built ones; memory is bounded by that sheet's output table, a small fraction of the
+workbook. A first pass over the country columns collects the shared country index used as
+the dictionary of both metrics. Updating to a new EDGAR release is then just:
+
+    python ingest_edgar.py data/EDGARv8.0_FT2022_GHG_booklet_2023.xlsx
+"""
+import argparse
+import os
+
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import build_data
+import country_codes
+
+# artifact -> booklet sheet
+SHEETS = {
+    'ghg': 'GHG_totals_by_country',
+    'ghg_per_capita': 'GHG_per_capita_by_country',
+}
+
+# matches what build_data.to_long writes
+SCHEMA = pa.schema([
+    ('EDGAR Country Code', pa.dictionary(pa.int16(), pa.string())),
+    ('Country', pa.dictionary(pa.int16(), pa.string())),
+    ('numeric_code', pa.int16()),
+    ('Year', pa.int16()),
+    ('Emissions', pa.float32()),
+])
+GLOBAL_SCHEMA = pa.schema([('Year', pa.int16()), ('Emissions', pa.float32())])
+
+
+def _sheet_rows(workbook, sheet):
+    """Yield ``(code, country, years, values)`` for every row of a country-by-year sheet."""
+    rows = workbook[sheet].iter_rows(values_only=True)
+    header = next(rows)
+    year_columns = [i for i, cell in enumerate(header) if isinstance(cell, int)]
+    years = [header[i] for i in year_columns]
+    for row in rows:
+        if row[1] is None:
+            continue
+        values = [float(row[i]) if row[i] is not None else None for i in year_columns]
+        yield row[0], row[1], years, values
+
+
+class _ArtifactWriter:
+    """Arrow IPC file written batch by batch to a temporary path, swapped in on success.
+
+    The batches are rewritten as a single one before the swap: load() only maps columns
+    that are contiguous, and would otherwise copy every chunked column in every process.
+    """
+
+    def __init__(self, name, schema):
+        self.path = build_data.artifact_path(name)
+        self.tmp_path = self.path + '.tmp'
+        self.schema = schema
+
+    def __enter__(self):
+        self._writer = pa.ipc.new_file(self.tmp_path, self.schema)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._writer.close()
+        try:
+            if exc_type is None:
+                with pa.memory_map(self.tmp_path) as source:
+                    table = pa.ipc.open_file(source).read_all().combine_chunks()
+                    feather.write_feather(table, self.path + '.combined', compression='uncompressed')
+                os.replace(self.path + '.combined', self.path)
+        finally:
+            os.remove(self.tmp_path)
+
+    def write(self, columns):
+        self._writer.write_batch(pa.record_batch(columns, schema=self.schema))
+
+
+def _countries(rows):
+    """``(code, display name)`` of every country row, skipping aggregates."""
+    for code, country, _, _ in rows:
+        if country not in build_data.GHG_EXCLUDED:
+            yield code, country_codes.DISPLAY_ALIASES.get(country, country)
+
+
+def _country_index(workbook):
+    countries = [
+        pd.DataFrame(list(_countries(_sheet_rows(workbook, sheet))), columns=['EDGAR Country Code', 'Country'])
+        for sheet in SHEETS.values()
+    ]
+    return build_data.country_index(countries)
+
+
+def _write_sheet(workbook, sheet, index, writer, global_writer=None):
+    code_dictionary = pa.array(index['EDGAR Country Code'])
+    name_dictionary = pa.array(index['Country'])
+    positions = {code: i for i, code in enumerate(index['EDGAR Country Code'])}
+    for code, country, years, values in _sheet_rows(workbook, sheet):
+        if country == 'GLOBAL TOTAL' and global_writer is not None:
+            global_writer.write([years, values])
+        if country in build_data.GHG_EXCLUDED:
+            continue
+        position = positions[code]
+        indices = pa.array([position] * len(years), pa.int16())
+        writer.write([
+            pa.DictionaryArray.from_arrays(indices, code_dictionary),
+            pa.DictionaryArray.from_arrays(indices, name_dictionary),
+            [index['numeric_code'].iat[position]] * len(years),
+            years,
+            values,
+        ])
+
+
+def ingest(path, names=None):
+    """Write the artifacts in ``names`` (default: all) from the booklet at ``path``."""
+    names = names or list(SHEETS)
+    os.makedirs(build_data.BUILD_DIR, exist_ok=True)
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        index = _country_index(workbook)
+        for name in names:
+            if name == 'ghg':
+                with _ArtifactWriter(name, SCHEMA) as writer, _ArtifactWriter('ghg_global', GLOBAL_SCHEMA) as global_writer:
+                    _write_sheet(workbook, SHEETS[name], index, writer, global_writer)
+                build_data.record_artifact('ghg_global', [path])
+            else:
+                with _ArtifactWriter(name, SCHEMA) as writer:
+                    _write_sheet(workbook, SHEETS[name], index, writer)
+            build_data.record_artifact(name, [path])
+    finally:
+        workbook.close()
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('booklet', help='path to the EDGAR GHG booklet .xlsx')
+    parser.add_argument('names', nargs='*', help='artifacts to write (default: ' + ', '.join(SHEETS) + ')')
+    args = parser.parse_args()
+    unknown = sorted(set(args.names) - set(SHEETS))
+    if unknown:
+        parser.error('unknown artifact(s): ' + ', '.join(unknown))
+
+    written = ingest(os.path.abspath(args.booklet), args.names)
+    print('wrote: ' + ', '.join(written))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Loaders for the app's DataFrames, cached once per process across all sessions.
+
+The returned frames are shared between sessions; copy before modifying them.
+"""
+import json
+import os
+import time
+
+import build_data
+from data_cache import DataCache
+from rank_index import RankIndex
+from rollups import YearRollup
+
+cache = DataCache(build_data.DATA_DIR)
+
+# where Streamlit serves files from static/ (server.enableStaticServing)
+STATIC_URL = 'app/static/'
+
+# this process's cache counters as JSON, next to the build manifest, for metrics scrapers;
+# rewritten at most every STATS_INTERVAL seconds
+STATS_PATH = os.path.join(build_data.BUILD_DIR, f'cache_stats.{os.getpid()}.json')
+STATS_INTERVAL = 10.0
+_stats_written = None
+
+
+def _load(name):
+    build_data.build([name])
+    return build_data.load(name)
+
+
+@cache.cached
+def co2_df():
+    return _load('co2')
+
+
+@cache.cached
+def ghg_melted():
+    return _load('ghg')
+
+
+@cache.cached
+def ghg_per_capita():
+    return _load('ghg_per_capita')
+
+
+@cache.cached
+def ghg_global():
+    return _load('ghg_global')
+
+
+@cache.cached
+def rank_index():
+    return RankIndex(ghg_melted(), ghg_global())
+
+
+@cache.cached
+def emissions_rollup():
+    return YearRollup(ghg_melted())
+
+
+@cache.cached
+def per_capita_rollup():
+    return YearRollup(ghg_per_capita())
+
+
+@cache.cached
+def sea_level_df():
+    return _load('sea_level')
+
+
+@cache.cached
+def annual_sums(name):
+    """Per-year sums of an append-only series (see annual.py), kept current with its artifact."""
+    build_data.build([name])
+    return build_data.load(build_data.annual_name(name))
+
+
+@cache.cached
+def coasts():
+    return _load('coasts')
+
+
+@cache.cached
+def world_topology_url():
+    """URL of the pre-joined world topology, served from static/."""
+    build_data.build([build_data.WORLD_ASSET])
+    return STATIC_URL + build_data.WORLD_ASSET
+
+
+@cache.cached
+def data_version(*names):
+    build_data.build(list(names))
+    return build_data.data_version(names)
+
+
+def write_cache_stats(extra=None):
+    """Publish ``cache.stats()``, with any ``extra`` sections, to STATS_PATH."""
+    global _stats_written
+    now = time.monotonic()
+    if _stats_written is not None and now - _stats_written < STATS_INTERVAL:
+        return
+    _stats_written = now
+    stats = {'pid': os.getpid(), 'time': time.time(), 'data': cache.stats()} | (extra or {})
+    os.makedirs(os.path.dirname(STATS_PATH), exist_ok=True)
+    tmp_path = STATS_PATH + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(stats, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, STATS_PATH)
@@ -0,0 +1,76 @@
+"""Per-year emissions ranking of every country, precomputed once per data version.
+
+For each year (and for the whole period) the index keeps the countries in descending order
+of emissions together with their running share of the ``GLOBAL TOTAL`` row, so top-k,
+rank-history and "how many countries make up X%" queries are lookups rather than sorts.
+"""
+import numpy as np
+import pandas as pd
+
+
+class RankIndex:
+    def __init__(self, ghg_melted, global_totals):
+        emissions = ghg_melted.pivot_table(index='Year', columns='Country', values='Emissions', aggfunc='sum', observed=True)
+        totals = global_totals.set_index('Year')['Emissions'].astype(float).reindex(emissions.index)
+
+        self.years = emissions.index.to_numpy()
+        self.countries = emissions.columns.astype(str).to_numpy()
+        values = emissions.fillna(0).to_numpy(dtype=float)
+
+        # one extra row at the end for the whole period
+        values = np.vstack([values, values.sum(axis=0)])
+        totals = np.append(totals.to_numpy(), totals.sum())
+
+        self._order = np.argsort(-values, axis=1, kind='stable')
+        self._sorted = np.take_along_axis(values, self._order, axis=1)
+        self._cumulative_share = np.cumsum(self._sorted, axis=1) / totals[:, None]
+        self._ranks = np.empty_like(self._order)
+        np.put_along_axis(self._ranks, self._order, np.arange(1, len(self.countries) + 1)[None, :], axis=1)
+        self._totals = totals
+        self._year_rows = {year: i for i, year in enumerate(self.years)}
+        self._country_columns = {country: i for i, country in enumerate(self.countries)}
+
+    def _row(self, year):
+        """Row for ``year``, or the whole-period row if ``year`` is None."""
+        if year is None:
+            return len(self.years)
+        try:
+            return self._year_rows[year]
+        except KeyError:
+            raise KeyError(f'no emissions data for {year}') from None
+
+    def top_k(self, k, year=None):
+        """The ``k`` largest emitters in ``year`` (or over the whole period) with their shares."""
+        row = self._row(year)
+        order = self._order[row, :k]
+        return pd.DataFrame({
+            'Rank': np.arange(1, len(order) + 1),
+            'Country': self.countries[order],
+            'Emissions': self._sorted[row, :k],
+            'Share': self._sorted[row, :k] / self._totals[row],
+            'Cumulative share': self._cumulative_share[row, :k],
+        })
+
+    def top_k_by_year(self, k):
+        """The ``k`` largest emitters of every year, year by year and in descending order."""
+        order = self._order[:-1, :k]
+        return pd.DataFrame({
+            'Year': np.repeat(self.years, order.shape[1]),
+            'Rank': np.tile(np.arange(1, order.shape[1] + 1), len(self.years)),
+            'Country': self.countries[order].ravel(),
+            'Emissions': self._sorted[:-1, :k].ravel(),
+        })
+
+    def rank_history(self, country):
+        """Rank of ``country`` in every year (1 = largest emitter)."""
+        return pd.Series(self._ranks[:-1, self._country_columns[country]], index=self.years, name=country)
+
+    def countries_for_share(self, share, year=None):
+        """Fewest countries whose emissions add up to more than ``share`` of the global total.
+
+        Returns None if all countries together do not exceed ``share`` (the global total also
+        counts international aviation and shipping).
+        """
+        cumulative = self._cumulative_share[self._row(year)]
+        count = int(np.searchsorted(cumulative, share, side='right')) + 1
+        return count if count <= len(cumulative) else None
@@ -0,0 +1,32 @@
+"""Prefix-sum rollups of per-country yearly series.
+
+Built once per data version; afterwards the total or mean of every country over any
+range of years is one subtraction per country, never a pass over the raw series.
+"""
+import numpy as np
+import pandas as pd
+
+
+class YearRollup:
+    def __init__(self, long_df, value='Emissions'):
+        table = long_df.pivot_table(index='Year', columns='Country', values=value, aggfunc='sum', observed=True)
+        self.years = table.index.to_numpy()
+        self.countries = table.columns.astype(str).to_numpy()
+        values = table.fillna(0).to_numpy(dtype=float)
+        # row i holds the sum of the first i years
+        self._prefix = np.vstack([np.zeros(len(self.countries)), np.cumsum(values, axis=0)])
+
+    def _bounds(self, start, end):
+        if start > end or start < self.years[0] or end > self.years[-1]:
+            raise ValueError(f'years must lie within {self.years[0]}-{self.years[-1]}, got {start}-{end}')
+        return np.searchsorted(self.years, start), np.searchsorted(self.years, end, side='right')
+
+    def total(self, start, end):
+        """Sum of each country's values from ``start`` to ``end`` inclusive."""
+        lo, hi = self._bounds(start, end)
+        return pd.Series(self._prefix[hi] - self._prefix[lo], index=self.countries)
+
+    def mean(self, start, end):
+        """Mean of each country's yearly values from ``start`` to ``end`` inclusive."""
+        lo, hi = self._bounds(start, end)
+        return pd.Series((self._prefix[hi] - self._prefix[lo]) / (hi - lo), index=self.countries)
@@ -0,0 +1,81 @@
+"""Schemas of the CSVs in data/: the columns read from each, their dtypes and fill values.
+
+Reading through a schema parses only the declared columns, straight into their dtypes,
+with the pyarrow engine unless the file's layout needs pandas' C parser. Sentinel values
+the sources use for missing measurements become NaN as the file is read, so a fill value
+is never plotted as data.
+"""
+import collections
+
+import numpy as np
+import pandas as pd
+
+
+class Schema:
+    """How to read one CSV.
+
+    ``columns`` maps each column read to its dtype. With ``other_columns`` set, every
+    column of the file is read and those not in ``columns`` get that dtype (the EDGAR
+    tables gain a column per year). ``sentinels`` maps columns to the values standing in
+    for a missing measurement; remaining keyword arguments go to ``pd.read_csv``.
+    """
+
+    def __init__(self, columns, sentinels=None, other_columns=None, engine='pyarrow', **options):
+        self.columns = columns
+        self.sentinels = sentinels or {}
+        self.other_columns = other_columns
+        self.engine = engine
+        self.options = options
+
+    def _dtypes(self, path):
+        if self.other_columns is None:
+            return self.columns
+        if self.engine != 'pyarrow':
+            return collections.defaultdict(lambda: self.other_columns, self.columns)
+        # the pyarrow engine only takes explicit dtypes, so name every column from the header
+        header = pd.read_csv(path, nrows=0, **self.options).columns
+        return {column: self.columns.get(column, self.other_columns) for column in header}
+
+    def read(self, path):
+        usecols = None if self.other_columns is not None else list(self.columns)
+        df = pd.read_csv(path, usecols=usecols, dtype=self._dtypes(path), engine=self.engine, **self.options)
+        for column, values in self.sentinels.items():
+            # compared in the column's own dtype, so -9.99 also matches a float32 -9.99
+            df[column] = df[column].mask(df[column].isin(np.asarray(values, dtype=df[column].dtype)))
+        return df
+
+
+_GMSL_GLOBAL = ('GMSL (Global Isostatic Adjustment (GIA) not applied) variation (mm) with respect to '
+                '20-year TOPEX/Jason collinear mean reference')
+
+_EDGAR = Schema({'EDGAR Country Code': 'object', 'Country': 'object'}, other_columns='float32')
+
+# file in data/ -> schema. coastline_lengths.csv, the Wikipedia table coasts_countries.csv
+# was compiled from, is not read: nothing uses it, and its footnote markers ("83,281[Note 3]")
+# would need cleaning no parser option covers.
+SCHEMAS = {
+    # NOAA Mauna Loa monthly means. The unread columns carry fills of their own: -1 days
+    # (fld5), -9.99 std. dev. of the days (fld6) and -0.9 uncertainty (std_dev).
+    'mean_co2_ppm.csv': Schema(
+        {'decimal_year': 'float64', 'monthly_average': 'float64'},
+        sentinels={'monthly_average': [-99.99]},
+    ),
+    # NASA altimetry GMSL by cycle: fld3 is the decimal year, fld6 the GIA-unadjusted GMSL
+    'sea_level.csv': Schema(
+        {'fld3': 'float64', 'fld6': 'float64'},
+        sentinels={'fld6': [99900]},
+    ),
+    # the same series with the descriptive headers of the NASA release; not used by the app
+    'mean_sea_level_global.csv': Schema(
+        {'year+fraction of year': 'float64', _GMSL_GLOBAL: 'float64'},
+        sentinels={_GMSL_GLOBAL: [99900]},
+    ),
+    'ghg_EDGAR_country.csv': _EDGAR,
+    'ghg_EDGAR_per_capita.csv': _EDGAR,
+    'coasts_countries.csv': Schema(
+        {'Country': 'object', 'Coastline Length': 'float64', 'Coast/area (m/km2)': 'float64', 'numeric_code': 'float64'},
+        # thousands separators and open bounds ('>200,000') need the C parser
+        engine='c', thousands=',', na_values={'Coast/area (m/km2)': ['>200,000', '>1,000,000']},
+    ),
+}
+
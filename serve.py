@@ -0,0 +1,72 @@
+"""Serve the app from several Streamlit workers sharing one read-only copy of the data.
+
+The prepared artifacts are built once and copied into a store directory (tmpfs at
+/dev/shm by default). Each worker is started with SEALEVEL_STORE pointing at it, never
+builds anything itself and memory-maps the artifacts from there, so the data pages are
+held once by the kernel no matter how many workers run, and a new worker only has to
+map a few files before it can serve.
+
+    python serve.py --workers 4 --port 8501   # workers on ports 8501-8504
+"""
+import argparse
+import os
+import shutil
+import signal
+import subprocess
+import sys
+
+import build_data
+
+MAIN_PATH = os.path.join(build_data.ROOT, 'main.py')
+DEFAULT_STORE = '/dev/shm/sealevel-vis' if os.path.isdir('/dev/shm') else os.path.join(build_data.ROOT, 'build', 'store')
+
+
+def prepare_store(store_dir):
+    """Build stale artifacts and publish them, with their manifest, into ``store_dir``."""
+    build_data.build()
+    os.makedirs(store_dir, exist_ok=True)
+    for name in build_data.artifact_files():
+        tmp_path = os.path.join(store_dir, name + '.tmp')
+        shutil.copyfile(os.path.join(build_data.BUILD_DIR, name), tmp_path)
+        # replacing rather than overwriting leaves files mapped by running workers intact
+        os.replace(tmp_path, os.path.join(store_dir, name))
+    return store_dir
+
+
+def start_worker(port, store_dir, streamlit_args=()):
+    env = dict(os.environ, SEALEVEL_STORE=store_dir)
+    command = [
+        sys.executable, '-m', 'streamlit', 'run', MAIN_PATH,
+        '--server.port', str(port), '--server.headless', 'true', *streamlit_args,
+    ]
+    return subprocess.Popen(command, env=env, cwd=build_data.ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='number of Streamlit processes')
+    parser.add_argument('--port', type=int, default=8501, help='port of the first worker; the rest follow it')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='directory holding the shared artifacts')
+    parser.add_argument('streamlit_args', nargs=argparse.REMAINDER, help='extra arguments passed to streamlit run')
+    args = parser.parse_args()
+
+    store_dir = prepare_store(os.path.abspath(args.store))
+    print(f'shared store ready at {store_dir}')
+    workers = [start_worker(args.port + i, store_dir, args.streamlit_args) for i in range(args.workers)]
+
+    def stop(*_):
+        for worker in workers:
+            worker.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        for worker in workers:
+            worker.wait()
+    except KeyboardInterrupt:
+        stop()
+        for worker in workers:
+            worker.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Serialized Vega-Lite specs, built once per data version and shared by every session.
+
+Building an Altair chart, validating it and serializing it with ``to_json`` costs far more
+than decoding the JSON again, so reruns only pay for the latter. Specs are keyed by chart
+name and the content hash of the build artifacts they were made from.
+
+Charts taking parameters, such as the year-range views, get a spec per distinct set of them,
+so only the most recently used ``max_specs`` are kept.
+"""
+import collections
+import json
+import threading
+import time
+
+
+class SpecCache:
+    def __init__(self, max_specs=64):
+        self._lock = threading.Lock()
+        self._specs = collections.OrderedDict()
+        self.max_specs = max_specs
+        self.hits = 0
+        self.misses = 0
+        self.build_seconds = 0.0
+        self.saved_seconds = 0.0
+        self.last_saved_seconds = 0.0
+
+    def get(self, name, version, builder):
+        """Return the spec dict for chart ``name``, calling ``builder`` only for a new version."""
+        start = time.perf_counter()
+        with self._lock:
+            cached = self._specs.get(name)
+            if cached is not None:
+                self._specs.move_to_end(name)
+        if cached is not None and cached[0] == version:
+            spec = json.loads(cached[1])
+            saved = cached[2] - (time.perf_counter() - start)
+            with self._lock:
+                self.hits += 1
+                self.saved_seconds += saved
+                self.last_saved_seconds = saved
+            return spec
+
+        serialized = builder().to_json(indent=None)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._specs[name] = (version, serialized, elapsed)
+            self._specs.move_to_end(name)
+            while len(self._specs) > self.max_specs:
+                self._specs.popitem(last=False)
+            self.misses += 1
+            self.build_seconds += elapsed
+        return json.loads(serialized)
+
+    def payload_bytes(self, name):
+        with self._lock:
+            return len(self._specs[name][1]) if name in self._specs else None
+
+    def clear(self):
+        with self._lock:
+            self._specs.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'specs': {name: len(serialized) for name, (_, serialized, _) in self._specs.items()},
+                'build_seconds': round(self.build_seconds, 4),
+                'saved_seconds': round(self.saved_seconds, 4),
+                'last_saved_seconds': round(self.last_saved_seconds, 4),
+            }
+
+
+specs = SpecCache()
@@ -0,0 +1,138 @@
+"""build_data's append path for the CO2 and sea-level feeds, against a local fixture feed.
+
+Each fixture is the start of the real feed plus a tail of the rows that follow it.
+"""
+import os
+import shutil
+
+import pandas as pd
+import pyarrow.feather as feather
+import pytest
+
+import build_data
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SOURCES = {name: sources[0] for name, (sources, _, _) in build_data.ARTIFACTS.items() if name in build_data.APPEND_ONLY}
+
+
+@pytest.fixture
+def feed(tmp_path, monkeypatch):
+    """Point build_data at a scratch data/ and build/ holding the fixture feeds."""
+    data_dir, build_dir = tmp_path / 'data', tmp_path / 'build'
+    data_dir.mkdir()
+    for source in SOURCES.values():
+        shutil.copyfile(os.path.join(FIXTURES, source), data_dir / source)
+    monkeypatch.setattr(build_data, 'DATA_DIR', str(data_dir))
+    monkeypatch.setattr(build_data, 'BUILD_DIR', str(build_dir))
+    monkeypatch.setattr(build_data, 'MANIFEST_PATH', str(build_dir / 'manifest.json'))
+
+    # record how many rows every cleaning call parses
+    parsed = []
+    for name in SOURCES:
+        sources, clean, version = build_data.ARTIFACTS[name]
+
+        def counting(path, clean=clean):
+            df = clean(path)
+            parsed.append(len(df))
+            return df
+
+        monkeypatch.setitem(build_data.ARTIFACTS, name, (sources, counting, version))
+    return data_dir, parsed
+
+
+def _append_tail(data_dir, source):
+    with open(os.path.join(FIXTURES, source.replace('.csv', '.append.csv'))) as tail, \
+            open(data_dir / source, 'a') as f:
+        f.write(tail.read())
+
+
+def _built(name):
+    return build_data.load(name), build_data.load(build_data.annual_name(name))
+
+
+@pytest.mark.parametrize('name', sorted(SOURCES))
+def test_append_matches_full_rebuild(feed, name):
+    data_dir, parsed = feed
+    build_data.build([name])
+    _append_tail(data_dir, SOURCES[name])
+    parsed.clear()
+
+    assert build_data.build([name]) == [name]
+    tail_rows = sum(1 for _ in open(os.path.join(FIXTURES, SOURCES[name].replace('.csv', '.append.csv'))))
+    assert parsed == [tail_rows]
+    assert feather.read_table(build_data.artifact_path(name)).column(0).num_chunks == 1
+    incremental, incremental_annual = _built(name)
+
+    build_data.build([name], force=True)
+    full, full_annual = _built(name)
+    pd.testing.assert_frame_equal(incremental, full)
+    pd.testing.assert_frame_equal(incremental_annual, full_annual)
+
+
+@pytest.mark.parametrize('name', sorted(SOURCES))
+def test_unchanged_source_is_skipped(feed, name):
+    _, parsed = feed
+    build_data.build([name])
+    parsed.clear()
+
+    assert build_data.build([name]) == []
+    assert parsed == []
+
+
+@pytest.mark.parametrize('name', sorted(SOURCES))
+def test_rewritten_prefix_is_rebuilt_in_full(feed, name):
+    data_dir, parsed = feed
+    build_data.build([name])
+    path = data_dir / SOURCES[name]
+    lines = path.read_text().splitlines(keepends=True)
+    # drop one of the rows already built from, then append as usual
+    path.write_text(''.join(lines[:10] + lines[11:]))
+    _append_tail(data_dir, SOURCES[name])
+    parsed.clear()
+
+    assert build_data.build([name]) == [name]
+    assert parsed == [len(path.read_text().splitlines()) - 1]
+    rebuilt, rebuilt_annual = _built(name)
+
+    build_data.build([name], force=True)
+    full, full_annual = _built(name)
+    pd.testing.assert_frame_equal(rebuilt, full)
+    pd.testing.assert_frame_equal(rebuilt_annual, full_annual)
+
+
+@pytest.mark.parametrize('name', sorted(SOURCES))
+def test_append_without_manifest_update_is_not_repeated(feed, name):
+    data_dir, parsed = feed
+    build_data.build([name])
+    manifest = build_data.read_manifest()
+    _append_tail(data_dir, SOURCES[name])
+    build_data.build([name])
+    appended, appended_annual = _built(name)
+    # as if the process died after swapping the artifacts in, before writing the manifest
+    build_data._write_manifest(manifest)
+    parsed.clear()
+
+    assert build_data.build([name]) == [name]
+    assert parsed == []
+    pd.testing.assert_frame_equal(build_data.load(name), appended)
+    pd.testing.assert_frame_equal(build_data.load(build_data.annual_name(name)), appended_annual)
+
+
+@pytest.mark.parametrize('name', sorted(SOURCES))
+def test_partly_written_row_waits_for_its_newline(feed, name):
+    data_dir, parsed = feed
+    build_data.build([name])
+    tail = open(os.path.join(FIXTURES, SOURCES[name].replace('.csv', '.append.csv'))).read()
+    path = data_dir / SOURCES[name]
+    with open(path, 'a') as f:
+        f.write(tail[:len(tail) // 2])
+    build_data.build([name])
+    with open(path, 'a') as f:
+        f.write(tail[len(tail) // 2:])
+    build_data.build([name])
+    incremental, incremental_annual = _built(name)
+
+    build_data.build([name], force=True)
+    full, full_annual = _built(name)
+    pd.testing.assert_frame_equal(incremental, full)
+    pd.testing.assert_frame_equal(incremental_annual, full_annual)
@@ -0,0 +1,61 @@
+"""Wall time, peak RSS and payload size per named stage of a run."""
+import contextlib
+import time
+
+
+def _memory_status():
+    """Current and peak resident set size in MB as ``(rss, peak)``, or None off Linux."""
+    try:
+        with open('/proc/self/status') as f:
+            fields = dict(line.split(':', 1) for line in f)
+    except OSError:
+        return None
+    # reported in kB
+    return int(fields['VmRSS'].split()[0]) / 1024, int(fields['VmHWM'].split()[0]) / 1024
+
+
+def _reset_peak_rss():
+    """Lower the kernel's peak-RSS mark to the current RSS; False where that is not supported."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+class Timings:
+    """Stage records of one run. Peak RSS is only tracked with ``track_rss``: the kernel keeps
+    one peak per process, so stages in concurrent sessions would reset each other's.
+    """
+
+    def __init__(self, track_rss=False):
+        self.stages = []
+        self.track_rss = track_rss
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the enclosed block; the yielded dict can take extra fields such as ``payload_bytes``.
+
+        When tracking RSS where the peak can be reset (Linux), each stage records the highest
+        RSS reached within it (``peak_rss_mb``) and how far that is above the RSS it started at
+        (``peak_rss_delta_mb``); elsewhere both are None, and without tracking they are left out.
+        """
+        record = {'stage': name}
+        tracked = self.track_rss and _reset_peak_rss()
+        status = _memory_status() if tracked else None
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 6)
+            if self.track_rss:
+                record['peak_rss_mb'] = record['peak_rss_delta_mb'] = None
+            if status is not None:
+                _, peak = _memory_status()
+                record['peak_rss_mb'] = round(peak, 1)
+                record['peak_rss_delta_mb'] = round(peak - status[0], 1)
+            self.stages.append(record)
+
+    def total_seconds(self):
+        return sum(record['seconds'] for record in self.stages)